@@ -4,33 +4,67 @@ app.py
 Purpose: Streamlit UI for sensitivity analysis and visualization.
 """
 
+import io
+
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+@st.cache_data
+def load_forecast(path):
+    # Streamlit reruns the script on every widget interaction; cache the
+    # load and the derived contact rate so only the first run pays for
+    # disk I/O. Parquet decodes columnar binary - no per-cell text parse.
+    df = pd.read_parquet(path)
+    # Average contact rate (from historical data)
+    avg_contact_rate = df['Forecasted_Call_Volume'].sum() / df['Forecasted_Membership'].sum()
+    # Pre-build the Date-indexed chart frames here so reruns don't pay
+    # two set_index copies each
+    membership_chart = df.set_index('Date')[['Forecasted_Membership']]
+    calls_chart = df.set_index('Date')[['Forecasted_Call_Volume']]
+    return df, avg_contact_rate, membership_chart, calls_chart
 
-# Load forecast results
-forecast_df = pd.read_csv("project/output/forecast_results_2026.csv")
 
-# Average contact rate (from historical data)
-avg_contact_rate = forecast_df['Forecasted_Call_Volume'].sum() / forecast_df['Forecasted_Membership'].sum()
+@st.cache_data
+def csv_bytes(df):
+    # Serialize once per distinct frame instead of on every rerun, through
+    # Arrow's vectorized CSV writer.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Arrow renders datetime64 timestamps with a full time component; cast
+    # to date32 so the download keeps plain YYYY-MM-DD dates
+    table = table.set_column(table.schema.get_field_index('Date'), 'Date', table['Date'].cast(pa.date32()))
+    buf = io.BytesIO()
+    pacsv.write_csv(table, buf)
+    return buf.getvalue()
+
+
+# Load forecast results
+forecast_df, avg_contact_rate, membership_chart, calls_chart = load_forecast("project/output/forecast_results_2026.parquet")
 
 # UI
 st.title("Forecast Sensitivity Analysis")
 
-membership = st.slider("Membership Count", 50000, 200000, 100000)
-aht = st.slider("Average Handle Time (AHT) in seconds", 300, 900, 600)
-shrinkage = st.slider("Shrinkage (%)", 10, 40, 25)
-occupancy = st.slider("Occupancy (%)", 70, 95, 85)
+# A form batches the slider values: the script reruns once per submit
+# instead of once per drag tick
+with st.form("sensitivity"):
+    membership = st.slider("Membership Count", 50000, 200000, 100000)
+    aht = st.slider("Average Handle Time (AHT) in seconds", 300, 900, 600)
+    shrinkage = st.slider("Shrinkage (%)", 10, 40, 25)
+    occupancy = st.slider("Occupancy (%)", 70, 95, 85)
+    submitted = st.form_submit_button("Compute")
 
-adjusted_volume = membership * avg_contact_rate
-st.write(f"Adjusted Call Volume: {adjusted_volume:,.0f}")
+if submitted:
+    adjusted_volume = membership * avg_contact_rate
+    st.write(f"Adjusted Call Volume: {adjusted_volume:,.0f}")
 
-agents_needed = adjusted_volume * aht / (occupancy / 100) / (1 - shrinkage / 100) / (8 * 3600)
-st.write(f"Agents Needed: {round(agents_needed)}")
+    agents_needed = adjusted_volume * aht / (occupancy / 100) / (1 - shrinkage / 100) / (8 * 3600)
+    st.write(f"Agents Needed: {round(agents_needed)}")
 
 st.subheader("Forecasted Membership Trend")
-st.line_chart(forecast_df[['Date', 'Forecasted_Membership']].set_index('Date'))
+st.line_chart(membership_chart)
 
 st.subheader("Forecasted Call Volume Trend")
-st.line_chart(forecast_df[['Date', 'Forecasted_Call_Volume']].set_index('Date'))
+st.line_chart(calls_chart)
 
-st.download_button("Download Forecast CSV", data=forecast_df.to_csv(index=False), file_name="forecast_results_2026.csv")
\ No newline at end of file
+st.download_button("Download Forecast CSV", data=csv_bytes(forecast_df), file_name="forecast_results_2026.csv")
\ No newline at end of file
@@ -1,22 +1,28 @@
-import pandas as pd
-import os
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 output_file = "project/data/sample/combined_data.csv"
 
 def combine_csv_files(input_directory, output_file):
-    # List to hold individual DataFrames
-    dataframes = []
-    
-    # Iterate over all files in the input directory
-    for filename in os.listdir(input_directory):
-        if filename.endswith('.csv'):
-            file_path = os.path.join(input_directory, filename)
-            # Read the CSV file and append to the list
-            df = pd.read_csv(file_path)
-            dataframes.append(df)
-    
-    # Concatenate all DataFrames into a single DataFrame
-    combined_df = pd.concat(dataframes, ignore_index=True)
-    
-    # Save the combined DataFrame to a new CSV file
-    combined_df.to_csv(output_file, index=False)
+    # Scan all CSVs in the directory as one Arrow dataset; the files are
+    # read in parallel C++ threads and land in a single contiguous table,
+    # avoiding a per-file pd.read_csv plus a pd.concat copy. Pinned column
+    # types skip per-column inference, and the narrow numeric dtypes halve
+    # the bytes moved for the table build and every downstream read
+    csv_format = ds.CsvFileFormat(
+        convert_options=pacsv.ConvertOptions(
+            column_types={
+                'Date': pa.date32(),
+                'Membership_Count': pa.int32(),
+                'Calls_Received': pa.int32(),
+                'Historical_Call_Volume': pa.int32(),
+                'Annual_Contact_Rate': pa.float32()
+            }
+        )
+    )
+    table = ds.dataset(input_directory, format=csv_format).to_table(use_threads=True)
+
+    # Write straight from the Arrow table - no pandas round-trip and no
+    # Python-level cell formatting
+    pacsv.write_csv(table, output_file)
     print(f"Combined CSV saved to {output_file}")